@@ -1,16 +1,87 @@
-from openai import OpenAI
+import asyncio
+import logging
+import orjson
+import httpx
+from openai import OpenAI, AsyncOpenAI
 from typing import List, Tuple
 from dotenv import load_dotenv
 import os
 from pathlib import Path
-from transformers import AutoModelForCausalLM, AutoTokenizer
-import torch
+
+try:
+    from vllm import LLM, SamplingParams
+    _VLLM_AVAILABLE = True
+except ImportError:
+    _VLLM_AVAILABLE = False
+
+try:
+    from vllm.sampling_params import GuidedDecodingParams
+    _GUIDED_DECODING_AVAILABLE = True
+except ImportError:
+    _GUIDED_DECODING_AVAILABLE = False
+
+# JSON schema for decomposition output, used for guided decoding so the
+# local model cannot produce malformed output
+_QUESTIONS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "questions": {
+            "type": "array",
+            "items": {"type": "string"}
+        }
+    },
+    "required": ["questions"]
+}
 
 load_dotenv('config.env')
 
-# Global variables for Mistral model loading
-_mistral_model = None
-_mistral_tokenizer = None
+log = logging.getLogger(__name__)
+
+# Global variable for the vLLM engine (cached after first load)
+_vllm_engine = None
+
+# Global OpenAI clients (created lazily so importing this module stays cheap).
+# Each OpenAI() constructs a fresh httpx client and pays a TCP/TLS handshake,
+# so the sync client is a shared singleton with HTTP/2 multiplexing over
+# pooled keep-alive connections. The async client is cached per event loop:
+# each asyncio.run call closes its loop, and keep-alive connections bound to
+# a closed loop fail with "Event loop is closed" on the next call.
+_openai_client = None
+_async_openai_clients = {}
+
+
+def get_openai_client() -> OpenAI:
+    """Return a shared OpenAI client, creating it on first use."""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = OpenAI(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            http_client=httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=32),
+            ),
+        )
+    return _openai_client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """Return an AsyncOpenAI client shared within the running event loop."""
+    # Drop clients whose loop has been closed (one per past asyncio.run)
+    for stale_loop in [l for l in _async_openai_clients if l.is_closed()]:
+        del _async_openai_clients[stale_loop]
+
+    loop = asyncio.get_running_loop()
+    client = _async_openai_clients.get(loop)
+    if client is None:
+        client = AsyncOpenAI(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            http_client=httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=32),
+            ),
+        )
+        _async_openai_clients[loop] = client
+    return client
 
 def decompose_statement_to_questions_openai(
     statement: str,
@@ -27,30 +98,166 @@ def decompose_statement_to_questions_openai(
     Returns:
         List[str]: A list of atomic questions.
     """
-    client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-    
+    client = get_openai_client()
+
     prompt = f"""
 Given the following factual statement, break it into individual atomic questions that can be independently verified.
 
 Statement: "{statement}"
 
-Atomic questions:"""
+Respond with JSON of the form {{"questions": ["question 1", "question 2", ...]}}."""
 
     response = client.chat.completions.create(
         model=model,
         messages=[
-            {"role": "system", "content": "You are a helpful assistant that verifies facts by breaking statements into verifiable sub-questions. Please ensure each question can be answered with a yes or no and an answer yes means that the original statement is true and an answer no means that the original statement is false. Please only include items from the statement that are objective facts"},
+            {"role": "system", "content": "You are a helpful assistant that verifies facts by breaking statements into verifiable sub-questions. Please ensure each question can be answered with a yes or no and an answer yes means that the original statement is true and an answer no means that the original statement is false. Please only include items from the statement that are objective facts. Respond only with a JSON object of the form {\"questions\": [...]}."},
             {"role": "user", "content": prompt}
         ],
         temperature=0.3,
-        max_tokens=300
+        max_tokens=300,
+        response_format={"type": "json_object"}
     )
 
     result = response.choices[0].message.content
-    questions = [q.strip("- ").strip() for q in result.split("\n") if q.strip()]
+    questions = orjson.loads(result)["questions"]
     return questions, len(questions)
 
 
+async def adecompose_statement_to_questions(
+    statement: str,
+    semaphore: asyncio.Semaphore = None,
+    model: str = "gpt-3.5-turbo-instruct",
+    max_retries: int = 5,
+) -> List[str]:
+    """
+    Decompose a single statement using the shared async client.
+
+    Retries with exponential backoff on transient API errors, and requests a
+    JSON response so parsing is a simple json.loads instead of splitting lines.
+    Callers that fan out many statements can pass a shared semaphore to cap
+    in-flight requests.
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(1)
+
+    client = get_async_openai_client()
+
+    prompt = f"""
+Given the following factual statement, break it into individual atomic questions that can be independently verified.
+
+Statement: "{statement}"
+
+Respond with JSON of the form {{"questions": ["question 1", "question 2", ...]}}."""
+
+    async with semaphore:
+        for attempt in range(max_retries):
+            try:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": "You are a helpful assistant that verifies facts by breaking statements into verifiable sub-questions. Please ensure each question can be answered with a yes or no and an answer yes means that the original statement is true and an answer no means that the original statement is false. Please only include items from the statement that are objective facts. Respond only with a JSON object of the form {\"questions\": [...]}."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3,
+                    max_tokens=300,
+                    response_format={"type": "json_object"}
+                )
+                result = response.choices[0].message.content
+                return orjson.loads(result)["questions"]
+            except Exception as e:
+                if attempt == max_retries - 1:
+                    raise
+                # Exponential backoff: 1s, 2s, 4s, 8s, ...
+                wait = 2 ** attempt
+                log.warning("Decomposition attempt %d failed (%s), retrying in %ds...", attempt + 1, e, wait)
+                await asyncio.sleep(wait)
+
+
+async def _decompose_statements_batch_async(
+    statements: List[str],
+    model: str = "gpt-3.5-turbo-instruct",
+    max_concurrent: int = 10,
+) -> List[List[str]]:
+    """Fire all decomposition requests concurrently, capped by a semaphore."""
+    semaphore = asyncio.Semaphore(max_concurrent)
+    tasks = [adecompose_statement_to_questions(s, semaphore, model=model) for s in statements]
+    return await asyncio.gather(*tasks)
+
+
+def decompose_statements_batch(
+    statements: List[str],
+    model: str = "gpt-3.5-turbo-instruct",
+    max_concurrent: int = 10,
+) -> List[List[str]]:
+    """
+    Decompose many statements into atomic questions with concurrent OpenAI calls.
+
+    This is a network-bound workload, so issuing the requests concurrently
+    (throttled to max_concurrent in flight) gives near-linear speedup over the
+    one-request-per-statement serial loop.
+
+    Args:
+        statements (List[str]): The factual statements to decompose.
+        model (str): Model name to use for completion.
+        max_concurrent (int): Maximum number of in-flight API requests.
+
+    Returns:
+        List[List[str]]: One list of atomic questions per input statement,
+        in the same order as the input.
+    """
+    if not statements:
+        return []
+    return asyncio.run(
+        _decompose_statements_batch_async(statements, model=model, max_concurrent=max_concurrent)
+    )
+
+
+def analyze_statement(
+    statement: str,
+    model: str = "gpt-3.5-turbo-instruct",
+) -> dict:
+    """
+    Decompose a statement and extract its subject and predicate in one call.
+
+    The model already reads the full statement to produce questions, so asking
+    for subject and predicate in the same structured response removes the
+    separate spaCy pass from the hot path.
+
+    Args:
+        statement (str): The input factual statement to analyze.
+        model (str): Model name to use for completion.
+
+    Returns:
+        dict: {"subject": str, "predicate": str, "questions": List[str]}
+    """
+    client = get_openai_client()
+
+    prompt = f"""
+Given the following factual statement, identify its grammatical subject and predicate, and break it into individual atomic questions that can be independently verified.
+
+Statement: "{statement}"
+
+Respond with JSON of the form {{"subject": "...", "predicate": "...", "questions": ["question 1", "question 2", ...]}}."""
+
+    response = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": "You are a helpful assistant that verifies facts by breaking statements into verifiable sub-questions. Please ensure each question can be answered with a yes or no and an answer yes means that the original statement is true and an answer no means that the original statement is false. Please only include items from the statement that are objective facts. Respond only with a JSON object of the form {\"subject\": \"...\", \"predicate\": \"...\", \"questions\": [...]}."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        max_tokens=300,
+        response_format={"type": "json_object"}
+    )
+
+    result = orjson.loads(response.choices[0].message.content)
+    return {
+        "subject": result.get("subject", ""),
+        "predicate": result.get("predicate", ""),
+        "questions": result.get("questions", []),
+    }
+
+
 def decompose_statement_to_questions(
     statement: str,
     use_local: bool = False,
@@ -74,150 +281,152 @@ def decompose_statement_to_questions(
 
 def load_mistral_model():
     """
-    Load the local Mistral model and tokenizer.
-    Uses global variables to cache the model after first load.
+    Load the local Mistral model as a vLLM engine.
+    Uses a global variable to cache the engine after first load.
+
+    vLLM's PagedAttention + continuous batching make one engine call over a
+    list of prompts far faster than per-statement HF generate() calls.
     """
-    global _mistral_model, _mistral_tokenizer
-    
-    if _mistral_model is not None and _mistral_tokenizer is not None:
-        return _mistral_model, _mistral_tokenizer
-    
+    global _vllm_engine
+
+    if _vllm_engine is not None:
+        return _vllm_engine
+
+    if not _VLLM_AVAILABLE:
+        log.error("vllm is not installed (pip install vllm). Falling back to OpenAI...")
+        return None
+
     # Get absolute path to the model directory
     model_path = Path("models/Mistral-7B-Instruct-v0.3").resolve()
-    
-    print(f"Loading Mistral model from {model_path}...")
-    
+
+    log.info("Loading Mistral model from %s...", model_path)
+
     # Check if model directory exists
     if not model_path.exists():
-        print(f"Error: Model directory not found at {model_path}")
-        print("Please run: python download_model.py")
-        print("Falling back to OpenAI...")
-        return None, None
-    
+        log.error("Model directory not found at %s; run: python download_model.py. Falling back to OpenAI...", model_path)
+        return None
+
     # Check for essential model files
     required_files = ["config.json", "tokenizer.json"]
     missing_files = [f for f in required_files if not (model_path / f).exists()]
     if missing_files:
-        print(f"Error: Missing required files: {missing_files}")
-        print("Model download appears incomplete. Please run: python download_model.py")
-        print("Falling back to OpenAI...")
-        return None, None
-    
+        log.error("Missing required files: %s. Model download appears incomplete; run: python download_model.py. Falling back to OpenAI...", missing_files)
+        return None
+
+    engine_kwargs = {
+        "model": str(model_path),
+        "dtype": "bfloat16",
+        "max_model_len": 2048,
+        "gpu_memory_utilization": 0.9,
+    }
+
+    # Optional quantization: set FACTCHECK_VLLM_QUANT=fp8 on Hopper-class GPUs
+    # (double ALU throughput, half the KV-cache bytes) or =awq with an
+    # AWQ-converted checkpoint. Narrower weights mean more concurrent
+    # sequences fit per generate() call.
+    quantization = os.getenv("FACTCHECK_VLLM_QUANT")
+    if quantization:
+        engine_kwargs["quantization"] = quantization
+        engine_kwargs["dtype"] = "auto"
+
     try:
-        _mistral_tokenizer = AutoTokenizer.from_pretrained(str(model_path), trust_remote_code=True)
-        
-        # Set pad token if not set
-        if _mistral_tokenizer.pad_token is None:
-            _mistral_tokenizer.pad_token = _mistral_tokenizer.eos_token
-        
-        _mistral_model = AutoModelForCausalLM.from_pretrained(
-            str(model_path),
-            torch_dtype=torch.bfloat16,
-            device_map="auto",
-            trust_remote_code=True,
-            low_cpu_mem_usage=True
-        )
-        print("Mistral model loaded successfully!")
-        return _mistral_model, _mistral_tokenizer
+        _vllm_engine = LLM(**engine_kwargs)
+        log.info("Mistral model loaded successfully!")
+        return _vllm_engine
     except Exception as e:
-        print(f"Error loading Mistral model: {e}")
-        print("Falling back to OpenAI...")
-        return None, None
+        log.error("Error loading Mistral model: %s. Falling back to OpenAI...", e)
+        return None
 
 
-def decompose_statement_to_questions_mistral(
-    statement: str,
-) -> Tuple[List[str], int]:
-    """
-    Decomposes a factual statement into atomic questions using local Mistral model.
-    
-    Args:
-        statement (str): The input factual statement to decompose.
-        
-    Returns:
-        Tuple[List[str], int]: A list of atomic questions and count.
-    """
-    model, tokenizer = load_mistral_model()
-    
-    if model is None or tokenizer is None:
-        print("Mistral model not available, falling back to OpenAI")
-        return decompose_statement_to_questions_openai(statement)
-    
-    # Create the prompt
+def _build_mistral_prompt(statement: str, tokenizer) -> str:
+    """Format the decomposition prompt for Mistral via its chat template."""
     system_prompt = "You are a helpful assistant that verifies facts by breaking statements into verifiable sub-questions. Please ensure each question can be answered with a yes or no and an answer yes means that the original statement is true and an answer no means that the original statement is false. Please only include items from the statement that are objective facts"
-    
+
     user_prompt = f"""Given the following factual statement, break it into individual atomic questions that can be independently verified.
 
 Statement: "{statement}"
 
-Atomic questions:"""
-    
-    # Format messages for Mistral
+Respond with JSON of the form {{"questions": ["question 1", "question 2", ...]}}."""
+
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt}
     ]
-    
-    # Apply chat template
+
     try:
-        prompt = tokenizer.apply_chat_template(
+        return tokenizer.apply_chat_template(
             messages,
             tokenize=False,
             add_generation_prompt=True
         )
     except Exception as e:
-        print(f"Warning: apply_chat_template failed: {e}")
+        log.warning("apply_chat_template failed: %s", e)
         # Fallback: create prompt manually
-        prompt = f"{system_prompt}\n\n{user_prompt}"
-    
-    # Tokenize
-    inputs = tokenizer(prompt, return_tensors="pt")
-    # Move to device if available
-    if hasattr(model, 'device'):
-        inputs = {k: v.to(model.device) if hasattr(v, 'to') else v for k, v in inputs.items()}
-    
-    # Generate
-    # Set up generation parameters
-    generation_kwargs = {
-        "max_new_tokens": 300,
+        return f"{system_prompt}\n\n{user_prompt}"
+
+
+def decompose_statements_mistral_batch(
+    statements: List[str],
+) -> List[List[str]]:
+    """
+    Decompose many statements at once with the local Mistral model via vLLM.
+
+    All prompts are handed to the engine in a single generate() call so
+    continuous batching can pack the sequences together.
+
+    Args:
+        statements (List[str]): The factual statements to decompose.
+
+    Returns:
+        List[List[str]]: One list of atomic questions per input statement.
+    """
+    llm = load_mistral_model()
+
+    if llm is None:
+        log.warning("Mistral model not available, falling back to OpenAI")
+        return [decompose_statement_to_questions_openai(s)[0] for s in statements]
+
+    tokenizer = llm.get_tokenizer()
+    prompts = [_build_mistral_prompt(s, tokenizer) for s in statements]
+
+    sampling_kwargs = {
         "temperature": 0.7,
-        "do_sample": True,
         "top_p": 0.9,
+        "max_tokens": 300,
         "repetition_penalty": 1.1,
     }
-    
-    # Handle pad token
-    if tokenizer.pad_token_id is None:
-        generation_kwargs["pad_token_id"] = tokenizer.eos_token_id
-    else:
-        generation_kwargs["pad_token_id"] = tokenizer.pad_token_id
-    
-    # Generate
-    with torch.no_grad():
+    # Constrain generation to the questions schema where supported, so the
+    # output is guaranteed to parse as JSON
+    if _GUIDED_DECODING_AVAILABLE:
+        sampling_kwargs["guided_decoding"] = GuidedDecodingParams(json=_QUESTIONS_SCHEMA)
+
+    outputs = llm.generate(prompts, SamplingParams(**sampling_kwargs))
+
+    questions_per_statement = []
+    for output in outputs:
+        result = output.outputs[0].text.strip()
         try:
-            outputs = model.generate(**inputs, **generation_kwargs)
-        except Exception as e:
-            print(f"Error during generation: {e}")
-            raise
-    
-    # Decode
-    generated_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
-    
-    # Debug: print full output
-    print(f"\nDebug: Full generated text length: {len(generated_text)}")
-    print(f"Debug: Prompt length: {len(prompt)}")
-    
-    # Extract the generated part (after the input prompt)
-    result = generated_text[len(prompt):].strip()
-    
-    print(f"Debug: Extracted result: {result[:200]}...")
-    
-    # Parse questions
-    questions = [q.strip("- ").strip() for q in result.split("\n") if q.strip()]
-    
-    # Debug: print questions
-    print(f"Debug: Parsed {len(questions)} questions")
-    
+            questions = orjson.loads(result)["questions"]
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            # Unguided models can still emit plain lists; fall back to line parsing
+            questions = [q.strip("- ").strip() for q in result.split("\n") if q.strip()]
+        questions_per_statement.append(questions)
+    return questions_per_statement
+
+
+def decompose_statement_to_questions_mistral(
+    statement: str,
+) -> Tuple[List[str], int]:
+    """
+    Decomposes a factual statement into atomic questions using local Mistral model.
+
+    Args:
+        statement (str): The input factual statement to decompose.
+
+    Returns:
+        Tuple[List[str], int]: A list of atomic questions and count.
+    """
+    questions = decompose_statements_mistral_batch([statement])[0]
     return questions, len(questions)
 
 # Example usage
@@ -1,22 +1,255 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+
+import diskcache
+import httpx
+import xxhash
+
 import search_results
 import break_statement
 
+log = logging.getLogger(__name__)
+
+# Concurrency caps for the async fan-out: at most this many statements are
+# checked at once, and API requests stay under the per-minute budget.
+MAX_CONCURRENT_CHECKS = int(os.getenv("FACTCHECK_MAX_CONCURRENT", "10"))
+RPM_LIMIT = int(os.getenv("FACTCHECK_RPM_LIMIT", "120"))
+
+# Persistent verdict cache: re-running the same dataset (or repeated
+# statements within one) costs a local lookup instead of the full
+# decompose -> search -> yes/no pipeline.
+_cache = diskcache.Cache(".factcheck_cache")
+
+
+def _statement_cache_key(statement: str) -> str:
+    """Hash a whitespace/case-normalized statement so trivial variants share a cache entry."""
+    normalized = " ".join(statement.lower().split())
+    return xxhash.xxh64(normalized).hexdigest()
+
+
 def check_statement(statement: str, use_local: bool = False) -> bool:
     """
     Check if a statement is factual.
-    
+
     Args:
         statement (str): The statement to check.
         use_local (bool): If True, use local Mistral model. If False, use OpenAI.
-        
+
     Returns:
         bool: True if statement is factual, False otherwise.
     """
+    key = _statement_cache_key(statement)
+    if key in _cache:
+        return _cache[key]
+
     questions, num_questions = break_statement.decompose_statement_to_questions(statement, use_local=use_local)
-    for question in questions:
-            if search_results.yes_no(question, use_local=use_local) == "No":
-                return False
-    return True
+    # All yes/no calls go out concurrently; checking for a "No" afterwards is
+    # cheaper than the serial round-trips the early exit used to save.
+    answers = search_results.yes_no_batch(questions, use_local=use_local)
+    is_factual = "No" not in answers
+
+    _cache[key] = is_factual
+    return is_factual
+
+class _SlidingWindowRateLimiter:
+    """Cap outbound API requests to a requests-per-minute budget.
+
+    Keeps a deque of request timestamps; acquire() sleeps until the oldest
+    timestamp in the 60s window has aged out.
+    """
+
+    def __init__(self, max_per_minute: int):
+        self.max_per_minute = max_per_minute
+        self._timestamps = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                while self._timestamps and now - self._timestamps[0] >= 60.0:
+                    self._timestamps.popleft()
+                if len(self._timestamps) < self.max_per_minute:
+                    self._timestamps.append(now)
+                    return
+                wait = 60.0 - (now - self._timestamps[0])
+            await asyncio.sleep(wait)
+
+
+async def _rate_limited_yes_no(http_client, question: str,
+                               limiter: _SlidingWindowRateLimiter) -> str:
+    await limiter.acquire()
+    return await search_results.ayes_no_openai(http_client, question)
+
+
+async def acheck_statement(
+    statement: str,
+    http_client,
+    semaphore: asyncio.Semaphore,
+    limiter: _SlidingWindowRateLimiter,
+) -> bool:
+    """
+    Async check of a single statement: decompose, then answer all of its
+    questions concurrently. Cache hits return without any network call.
+
+    Failures are contained per statement — one row whose decomposition or
+    yes/no calls give out must not cancel the rest of the batch — so errors
+    come back as None rather than propagating (mirroring process_csv_row's
+    per-row try/except).
+    """
+    key = _statement_cache_key(statement)
+    if key in _cache:
+        return _cache[key]
+
+    try:
+        async with semaphore:
+            await limiter.acquire()
+            questions = await break_statement.adecompose_statement_to_questions(statement)
+            answers = await asyncio.gather(
+                *[_rate_limited_yes_no(http_client, q, limiter) for q in questions]
+            )
+    except Exception as e:
+        log.error("Error checking statement %r: %s", statement, e)
+        return None
+
+    is_factual = "No" not in answers
+    _cache[key] = is_factual
+    return is_factual
+
+
+async def acheck_statements(statements) -> list:
+    """
+    Check many statements concurrently (OpenAI path).
+
+    Each statement runs its whole decompose -> search -> yes/no pipeline as
+    one task, so total wall time approaches the max of the independent
+    request latencies rather than their sum, bounded by the semaphore and
+    the sliding-window RPM limiter. Rows that fail come back as None.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHECKS)
+    limiter = _SlidingWindowRateLimiter(RPM_LIMIT)
+    async with httpx.AsyncClient(timeout=30.0) as http_client:
+        tasks = [
+            acheck_statement(s, http_client, semaphore, limiter)
+            for s in statements
+        ]
+        return await asyncio.gather(*tasks)
+
+
+async def astream_statements(statements):
+    """
+    Check statements concurrently, yielding (index, verdict) pairs as each
+    finishes.
+
+    Same fan-out as acheck_statements, but results surface in completion
+    order instead of arriving all at once, so a streaming caller can forward
+    each verdict the moment it exists.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHECKS)
+    limiter = _SlidingWindowRateLimiter(RPM_LIMIT)
+    async with httpx.AsyncClient(timeout=30.0) as http_client:
+
+        async def check_one(index, statement):
+            return index, await acheck_statement(statement, http_client, semaphore, limiter)
+
+        tasks = [
+            asyncio.create_task(check_one(i, s))
+            for i, s in enumerate(statements)
+        ]
+        for task in asyncio.as_completed(tasks):
+            yield await task
+
+
+def _check_statements_batch_api(statements) -> list:
+    """
+    Check statements via one OpenAI Batch API submission.
+
+    Mirrors the cached/batched flow: cache hits resolve locally, misses are
+    decomposed concurrently, and all resulting questions go out as a single
+    batch upload whose answers are sliced back out per statement.
+    """
+    keys = [_statement_cache_key(s) for s in statements]
+    verdicts = [_cache[key] if key in _cache else None for key in keys]
+    miss_indices = [i for i, v in enumerate(verdicts) if v is None]
+    miss_statements = [statements[i] for i in miss_indices]
+
+    if not miss_statements:
+        return verdicts
+
+    questions_per_statement = break_statement.decompose_statements_batch(miss_statements)
+
+    all_questions = []
+    question_counts = []
+    for questions in questions_per_statement:
+        all_questions.extend(questions)
+        question_counts.append(len(questions))
+
+    answers = search_results.yes_no_openai_batch(all_questions)
+
+    offset = 0
+    for index, count in zip(miss_indices, question_counts):
+        is_factual = "No" not in answers[offset:offset + count]
+        offset += count
+        verdicts[index] = is_factual
+        _cache[keys[index]] = is_factual
+    return verdicts
+
+
+def check_statements(statements, use_local: bool = False):
+    """
+    Check a batch of statements, decomposing them all in one concurrent pass.
+
+    Args:
+        statements (List[str]): The statements to check.
+        use_local (bool): If True, use local Mistral model. If False, use OpenAI.
+
+    Returns:
+        List[bool]: One verdict per statement, in input order (None for a
+        statement whose check failed, on the async path).
+    """
+    if not statements:
+        return []
+
+    if not use_local:
+        # Bulk jobs can opt into the OpenAI Batch API (~half price, minutes
+        # of queueing latency); otherwise each statement's whole pipeline
+        # runs as one concurrent task
+        if os.getenv("FACTCHECK_USE_BATCH_API"):
+            return _check_statements_batch_api(statements)
+        return asyncio.run(acheck_statements(statements))
+
+    # Local path: resolve cache hits first; only misses hit the model
+    keys = [_statement_cache_key(s) for s in statements]
+    verdicts = [_cache[key] if key in _cache else None for key in keys]
+    miss_indices = [i for i, v in enumerate(verdicts) if v is None]
+    miss_statements = [statements[i] for i in miss_indices]
+
+    if not miss_statements:
+        return verdicts
+
+    questions_per_statement = break_statement.decompose_statements_mistral_batch(miss_statements)
+
+    # Flatten every statement's questions into one concurrent yes/no batch,
+    # then slice the answers back out per statement
+    all_questions = []
+    question_counts = []
+    for questions in questions_per_statement:
+        all_questions.extend(questions)
+        question_counts.append(len(questions))
+
+    answers = search_results.yes_no_batch(all_questions, use_local=use_local)
+
+    offset = 0
+    for index, count in zip(miss_indices, question_counts):
+        is_factual = "No" not in answers[offset:offset + count]
+        offset += count
+        verdicts[index] = is_factual
+        _cache[keys[index]] = is_factual
+    return verdicts
+
 
 if __name__ == "__main__":
     print("Testing with OpenAI:")
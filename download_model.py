@@ -3,6 +3,12 @@ import sys
 import argparse
 from pathlib import Path
 
+# Use the Rust-backed hf_transfer downloader when installed: it pipelines
+# chunked range requests and saturates fast links that a single Python HTTP
+# connection cannot. Must be set before importing huggingface_hub, which
+# reads the env var once at import time.
+os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
 try:
     from huggingface_hub import snapshot_download, login
 except ImportError as e:
@@ -82,6 +88,9 @@ def main() -> int:
             revision=args.revision,
             local_dir=str(local_dir),
             max_workers=args.max_workers,
+            # Safetensors only: skips the duplicate .bin weights, halving the
+            # download and letting the model load via mmap.
+            allow_patterns=["*.safetensors", "*.json", "tokenizer*", "*.model"],
         )
     except Exception as err:
         print("Download failed.")
@@ -4,20 +4,45 @@ Merged subject and predicate extraction module for fact-checking system.
 Extracts both subject and predicate in a single pass to avoid duplicate parsing.
 """
 
-import spacy
-from typing import Optional, Tuple
+import logging
+
+import numpy as np
+from typing import List, Optional, Tuple
+
+# spaCy is imported lazily inside load_spacy_model: just importing the
+# package costs around a second and pulls in the thinc stack, which the CSV
+# path (LLM decomposition plus the heuristic fallback) never needs.
+
+log = logging.getLogger(__name__)
+
+# Cached spaCy pipeline, loaded once per process. Only dep_ and pos_ are used
+# below, so NER and lemmatization are disabled to trim per-doc compute. The
+# attribute ruler must stay enabled: in en_core_web_sm it is what maps fine
+# tag_ to the coarse pos_ values the extractor matches on.
+_NLP = None
+_NLP_LOADED = False
 
 
 def load_spacy_model():
-    """Load spaCy model for NLP processing."""
+    """Load spaCy model for NLP processing (cached after first call)."""
+    global _NLP, _NLP_LOADED
+    if _NLP_LOADED:
+        return _NLP
+
+    _NLP_LOADED = True
     try:
-        return spacy.load("en_core_web_sm")
+        import spacy
+        _NLP = spacy.load("en_core_web_sm", disable=["ner", "lemmatizer"])
+    except ImportError:
+        log.warning("spaCy is not installed. Please install it with: pip install spacy")
+        _NLP = None
     except OSError:
-        print("Warning: spaCy model 'en_core_web_sm' not found. Please install it with: python -m spacy download en_core_web_sm")
-        return None
+        log.warning("spaCy model 'en_core_web_sm' not found. Please install it with: python -m spacy download en_core_web_sm")
+        _NLP = None
+    return _NLP
 
 
-def extract_components_with_spacy(statement: str, nlp_model: spacy.Language) -> Tuple[str, str]:
+def extract_components_with_spacy(statement: str, nlp_model: "spacy.Language") -> Tuple[str, str]:
     """
     Extract both subject and predicate using spaCy NLP model in a single pass.
     
@@ -29,60 +54,107 @@ def extract_components_with_spacy(statement: str, nlp_model: spacy.Language) ->
         Tuple[str, str]: (subject, predicate)
     """
     doc = nlp_model(statement)
-    
+    return _extract_components_from_doc(doc, statement)
+
+
+def _extract_components_from_doc(doc, statement: str) -> Tuple[str, str]:
+    """
+    Extract subject and predicate from an already-parsed spaCy Doc.
+
+    Works on the Doc's numeric attribute arrays (structure-of-arrays view)
+    instead of walking Token objects: dep/pos comparisons become integer
+    compares on NumPy arrays and only the few selected tokens ever have
+    their .text materialized.
+    """
+    n = len(doc)
+    if n == 0:
+        return "", ""
+
+    # Cheap here: spaCy is necessarily already imported once a Doc exists
+    from spacy.attrs import DEP, POS, HEAD, IS_STOP
+
+    # One SoA export: columns are dep label, coarse POS, head offset, is_stop
+    arr = doc.to_array([DEP, POS, HEAD, IS_STOP])
+    deps = arr[:, 0]
+    poses = arr[:, 1]
+    # HEAD is stored as an offset relative to the token; convert to absolute
+    heads = arr[:, 2].astype(np.int64) + np.arange(n, dtype=np.int64)
+    stops = arr[:, 3]
+
+    # String-store symbol ids for the labels we compare against
+    strings = doc.vocab.strings
+    dep_nsubj = strings["nsubj"]
+    dep_compound = strings["compound"]
+    dep_root = strings["ROOT"]
+    dep_ccomp = strings["ccomp"]
+    dep_xcomp = strings["xcomp"]
+    dep_dobj = strings["dobj"]
+    dep_attr = strings["attr"]
+    dep_acomp = strings["acomp"]
+    dep_prep = strings["prep"]
+    dep_pobj = strings["pobj"]
+    dep_amod = strings["amod"]
+    dep_det = strings["det"]
+    pos_verb = strings["VERB"]
+    pos_noun = strings["NOUN"]
+
     subject = ""
     predicate_parts = []
-    
-    # First pass: find subject and main verb
-    main_verb = None
-    for token in doc:
-        # Find main subject (nsubj dependency)
-        if token.dep_ == "nsubj" and not token.is_stop:
-            subject = token.text
-            # Include compound subjects
-            for child in token.children:
-                if child.dep_ == "compound":
-                    subject = f"{child.text} {subject}"
-        
-        # Find main verb (root or main predicate)
-        if token.dep_ in ["ROOT", "ccomp", "xcomp"] and token.pos_ == "VERB":
-            main_verb = token
-            predicate_parts.append(token.text)
-    
+
+    # Subject: last non-stop nsubj token, with its compound children prepended
+    subj_candidates = np.where((deps == dep_nsubj) & (stops == 0))[0]
+    if subj_candidates.size:
+        subj_idx = int(subj_candidates[-1])
+        subject = doc[subj_idx].text
+        compound_idx = np.where((heads == subj_idx) & (deps == dep_compound))[0]
+        for child_idx in compound_idx:
+            subject = f"{doc[int(child_idx)].text} {subject}"
+
+    # Main verb: ROOT/ccomp/xcomp tokens tagged VERB (each contributes text)
+    verb_mask = ((deps == dep_root) | (deps == dep_ccomp) | (deps == dep_xcomp)) & (poses == pos_verb)
+    verb_idx = np.where(verb_mask)[0]
+    predicate_parts.extend(doc[int(i)].text for i in verb_idx)
+    main_verb = int(verb_idx[-1]) if verb_idx.size else None
+
     # If no clear subject found, try to find the first noun
     if not subject:
-        for token in doc:
-            if token.pos_ == "NOUN" and not token.is_stop:
-                subject = token.text
-                break
-    
+        noun_idx = np.where((poses == pos_noun) & (stops == 0))[0]
+        if noun_idx.size:
+            subject = doc[int(noun_idx[0])].text
+
     # If still no subject, return the first few words
     if not subject:
         words = statement.split()[:3]
         subject = " ".join(words)
-    
-    # Second pass: build predicate around the main verb
-    if main_verb:
-        for child in main_verb.children:
-            # Direct complements
-            if child.dep_ in ("dobj", "attr", "acomp"):
-                # Include object + its modifiers in correct order
-                mods = [gc for gc in child.children if gc.dep_ in ("amod", "det", "compound")]
-                # Sort by token position to preserve word order
-                seq = sorted(mods + [child], key=lambda t: t.i)
-                predicate_parts.extend(t.text for t in seq)
+
+    # Build predicate around the main verb's children
+    if main_verb is not None:
+        children = np.where(heads == main_verb)[0]
+        children = children[children != main_verb]  # ROOT is its own head
+        mod_deps = (dep_amod, dep_det, dep_compound)
+        for child in children:
+            child = int(child)
+            child_dep = deps[child]
+
+            # Direct complements: object + its modifiers in word order
+            if child_dep == dep_dobj or child_dep == dep_attr or child_dep == dep_acomp:
+                grandchildren = np.where(heads == child)[0]
+                mods = [int(gc) for gc in grandchildren if deps[int(gc)] in mod_deps]
+                seq = np.sort(np.array(mods + [child], dtype=np.int64))
+                predicate_parts.extend(doc[int(i)].text for i in seq)
 
             # Prepositional phrase off the verb
-            if child.dep_ == "prep":
-                # Include the preposition itself
-                predicate_parts.append(child.text)
-                # Include pobj + its modifiers (det/amod/compound) in order
-                for gc in child.children:
-                    if gc.dep_ == "pobj":
-                        mods = [gg for gg in gc.children if gg.dep_ in ("det", "amod", "compound")]
-                        seq = sorted(mods + [gc], key=lambda t: t.i)
-                        predicate_parts.extend(t.text for t in seq)
-    
+            if child_dep == dep_prep:
+                predicate_parts.append(doc[child].text)
+                grandchildren = np.where(heads == child)[0]
+                for gc in grandchildren:
+                    gc = int(gc)
+                    if deps[gc] == dep_pobj:
+                        ggc = np.where(heads == gc)[0]
+                        mods = [int(gg) for gg in ggc if deps[int(gg)] in mod_deps]
+                        seq = np.sort(np.array(mods + [gc], dtype=np.int64))
+                        predicate_parts.extend(doc[int(i)].text for i in seq)
+
     # If no clear predicate found, extract everything after the subject
     if not predicate_parts:
         # Simple approach: remove common subject indicators and take the rest
@@ -101,40 +173,45 @@ def extract_components_with_spacy(statement: str, nlp_model: spacy.Language) ->
     return subject, predicate
 
 
+# Frozen word sets for the no-spaCy fallback: O(1) membership checks instead
+# of rebuilding a list literal on every loop iteration
+_SUBJECT_INDICATORS = frozenset({'the', 'a', 'an', 'this', 'that', 'these', 'those'})
+_VERB_INDICATORS = frozenset({'is', 'are', 'was', 'were', 'has', 'have', 'had'})
+
+
 def extract_components_fallback(statement: str) -> Tuple[str, str]:
     """
     Fallback method to extract both subject and predicate without spaCy.
-    
+
     Args:
         statement (str): The input statement to analyze
-        
+
     Returns:
         Tuple[str, str]: (subject, predicate)
     """
     words = statement.split()
-    
+    # Lowercase each token once; both scans below reuse this
+    lowered = [w.lower() for w in words]
+
     # Extract subject
     subject = ""
-    for i, word in enumerate(words):
-        if word.lower() not in ['the', 'a', 'an', 'this', 'that', 'these', 'those']:
+    for i, word in enumerate(lowered):
+        if word not in _SUBJECT_INDICATORS:
             # Take 1-3 words starting from this position
             subject_words = words[i:i+3]
             subject = " ".join(subject_words)
             break
-    
+
     # Fallback to first 3 words if no subject found
     if not subject:
         subject = " ".join(words[:3])
-    
-    # Extract predicate
-    subject_indicators = ['the', 'a', 'an', 'this', 'that', 'these', 'those']
-    
+
     # Find where the predicate likely starts (after first noun phrase)
     predicate_start = 0
-    for i, word in enumerate(words):
-        if word.lower() in subject_indicators:
+    for i, word in enumerate(lowered):
+        if word in _SUBJECT_INDICATORS:
             predicate_start = i + 1
-        elif word.lower() in ['is', 'are', 'was', 'were', 'has', 'have', 'had']:
+        elif word in _VERB_INDICATORS:
             predicate_start = i + 1
             break
     
@@ -146,7 +223,7 @@ def extract_components_fallback(statement: str) -> Tuple[str, str]:
     return subject, predicate
 
 
-def extract_components(statement: str, nlp_model: Optional[spacy.Language] = None) -> Tuple[str, str]:
+def extract_components(statement: str, nlp_model: Optional["spacy.Language"] = None) -> Tuple[str, str]:
     """
     Extract both subject and predicate from a statement in a single pass.
     
@@ -166,6 +243,35 @@ def extract_components(statement: str, nlp_model: Optional[spacy.Language] = Non
         return extract_components_fallback(statement)
 
 
+def extract_components_batch(statements: List[str],
+                             nlp_model: Optional["spacy.Language"] = None,
+                             batch_size: int = 64) -> List[Tuple[str, str]]:
+    """
+    Extract (subject, predicate) for many statements in one pipeline pass.
+
+    Uses nlp.pipe so tokenization and parsing are batched across documents
+    instead of paying the pipeline dispatch cost per statement.
+
+    Args:
+        statements (List[str]): The input statements to analyze
+        nlp_model (Optional[spacy.Language]): spaCy model; loaded/cached if omitted
+        batch_size (int): Number of documents per pipe batch
+
+    Returns:
+        List[Tuple[str, str]]: One (subject, predicate) pair per statement
+    """
+    if nlp_model is None:
+        nlp_model = load_spacy_model()
+
+    if nlp_model is None:
+        return [extract_components_fallback(s) for s in statements]
+
+    results = []
+    for statement, doc in zip(statements, nlp_model.pipe(statements, batch_size=batch_size)):
+        results.append(_extract_components_from_doc(doc, statement))
+    return results
+
+
 if __name__ == "__main__":
     # Example usage
     test_statements = [
@@ -1,13 +1,20 @@
 import csv
 import io
+import logging
+import orjson
+import pandas as pd
+import pyarrow.csv as pa_csv
 from fastapi import FastAPI, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import re
-import spacy
 from typing import List, Dict, Tuple, Optional, Union
 import os
 from dotenv import load_dotenv
 
+log = logging.getLogger(__name__)
+
 # Load environment variables from config.env file
 load_dotenv('config.env')
 
@@ -15,17 +22,19 @@ load_dotenv('config.env')
 tavily_api_key = os.getenv('TAVILY_API_KEY')
 
 if tavily_api_key:
-    print("Tavily API key loaded successfully!")
-    # Your code here
+    log.info("Tavily API key loaded successfully!")
 else:
-    print("Please set your TAVILY_API_KEY in the config.env file")
+    log.warning("Please set your TAVILY_API_KEY in the config.env file")
 
 # Import functions from separate modules
-from extract_components import extract_components, load_spacy_model
+from break_statement import analyze_statement
+from extract_components import extract_components_fallback
 from subjective_claim import (
-    detect_subjectivity, get_subjective_patterns, get_opinion_words
+    detect_subjectivity, detect_subjectivity_series,
+    exceeds_subjectivity_threshold,
+    get_subjective_patterns, get_opinion_words
 )
-from checker import check_statement
+from checker import check_statement, check_statements, astream_statements
 
 
 
@@ -35,17 +44,17 @@ def validate_csv_file(csv_file_path: str) -> bool:
         with open(csv_file_path, 'r', encoding='utf-8') as file:
             return True
     except FileNotFoundError:
-        print(f"Error: CSV file '{csv_file_path}' not found.")
+        log.error("CSV file '%s' not found.", csv_file_path)
         return False
     except Exception as e:
-        print(f"Error validating CSV file: {e}")
+        log.error("Error validating CSV file: %s", e)
         return False
 
 
 def validate_statement_column(row: Dict, statement_column: str) -> bool:
     """Validate that the statement column exists in the CSV row."""
     if statement_column not in row:
-        print(f"Warning: Column '{statement_column}' not found in CSV. Available columns: {list(row.keys())}")
+        log.warning("Column '%s' not found in CSV. Available columns: %s", statement_column, list(row.keys()))
         return False
     return True
 
@@ -54,6 +63,10 @@ def clean_text(text: str) -> str:
     """Clean and normalize text input."""
     if not text:
         return ""
+    if not isinstance(text, str):
+        # pyarrow ingest infers column types, so a numeric-looking cell can
+        # arrive as int/float
+        text = str(text)
     return text.strip()
 
 
@@ -66,18 +79,28 @@ def is_empty_statement(statement: str) -> bool:
 # CSV PROCESSING FUNCTIONS
 # =============================================================================
 
-def read_csv_file(csv_file_path: str) -> List[Dict]:
-    """Read CSV file and return list of rows."""
+def iter_csv_rows(csv_file_path: str):
+    """
+    Stream CSV rows one at a time instead of materializing the whole file.
+
+    Uses pyarrow's incremental reader: SIMD-accelerated parsing a block at a
+    time, yielding plain dicts batch by batch, so memory stays bounded and
+    the per-row Python work drops to a dict conversion.
+    """
     if not validate_csv_file(csv_file_path):
-        return []
-    
+        return
+
     try:
-        with open(csv_file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            return list(reader)
+        with pa_csv.open_csv(csv_file_path) as reader:
+            for batch in reader:
+                yield from batch.to_pylist()
     except Exception as e:
-        print(f"Error reading CSV file: {e}")
-        return []
+        log.error("Error reading CSV file: %s", e)
+
+
+def read_csv_file(csv_file_path: str) -> List[Dict]:
+    """Read CSV file and return list of rows (use iter_csv_rows to stream)."""
+    return list(iter_csv_rows(csv_file_path))
 
 
 def extract_statement_from_row(row: Dict, statement_column: str) -> Optional[str]:
@@ -92,8 +115,8 @@ def extract_statement_from_row(row: Dict, statement_column: str) -> Optional[str
     return statement
 
 
-def process_csv_row(row: Dict, row_number: int, statement_column: str, 
-                   nlp_model: Optional[spacy.Language] = None) -> Optional[Dict]:
+def process_csv_row(row: Dict, row_number: int, statement_column: str,
+                   nlp_model: Optional["spacy.Language"] = None) -> Optional[Dict]:
     """Process a single CSV row through statement checking."""
     statement = extract_statement_from_row(row, statement_column)
     if not statement:
@@ -117,7 +140,7 @@ def process_csv_row(row: Dict, row_number: int, statement_column: str,
         }
         return result
     except Exception as e:
-        print(f"Error processing row {row_number}: {e}")
+        log.error("Error processing row %d: %s", row_number, e)
         return None
 
 
@@ -125,38 +148,87 @@ def process_csv_row(row: Dict, row_number: int, statement_column: str,
 # MAIN PROCESSING FUNCTIONS
 # =============================================================================
 
-def process_statements_from_csv(csv_file_path: str, statement_column: str = 'statement') -> List[Dict[str, str]]:
+def _clean_and_flag(statements: pd.Series) -> Tuple[List[str], List[bool]]:
     """
-    Read statements from a CSV file and return UI-friendly verdicts for each.
+    Vectorized cleanup plus per-row subjectivity flags for a statement column.
 
-    For each non-empty statement:
-      - If subjective, return verdict "SKIPPED_SUBJECTIVE" without calling check_statement
-      - Otherwise, call check_statement and return verdict "YES" or "NO"
+    Cleaning, empty-row removal and regex subjectivity detection are all
+    vectorized operations; regex survivors then get a second, still-local
+    screen — a TextBlob subjectivity score (microseconds) — before anything
+    is allowed to cost an LLM call plus a web search. The TextBlob screen is
+    a no-op when the library isn't installed.
 
-    Returns a list of {"statement": str, "verdict": str}.
+    Returns:
+        Tuple[List[str], List[bool]]: cleaned statements and a parallel list
+        of flags, True where the row is subjective.
     """
-    csv_rows = read_csv_file(csv_file_path)
-    if not csv_rows:
-        return []
+    statements = statements.astype("string").str.strip()
+    statements = statements[statements.notna() & (statements.str.len() > 0)]
+    subjective_mask = detect_subjectivity_series(statements)
+
+    cleaned = statements.tolist()
+    subjective = [
+        is_subj or exceeds_subjectivity_threshold(statement)
+        for statement, is_subj in zip(cleaned, subjective_mask.tolist())
+    ]
+    return cleaned, subjective
 
-    results: List[Dict[str, str]] = []
 
-    for row in csv_rows:
-        statement = extract_statement_from_row(row, statement_column)
-        if not statement:
-            continue
+def _iter_statement_verdicts(statements: pd.Series):
+    """
+    Yield {"statement", "verdict"} dicts for a Series of statements.
+
+    Only the factual survivors of _clean_and_flag are handed to the batched
+    checker. Yielding row-by-row lets the caller (e.g. the CSV writer) drain
+    results without holding a second copy of the whole output.
+    """
+    cleaned, subjective = _clean_and_flag(statements)
+    factual_statements = [s for s, is_subj in zip(cleaned, subjective) if not is_subj]
 
-        if detect_subjectivity(statement):
-            results.append({"statement": statement, "verdict": "SKIPPED_SUBJECTIVE"})
-            continue
+    # One batched (concurrent) check over all factual statements
+    verdicts = iter(check_statements(factual_statements))
 
-        # verdict = "YES" if check_statement(statement) else "NO"
-        # results.append({"statement": statement, "verdict": verdict})
+    for statement, is_subjective in zip(cleaned, subjective):
+        if is_subjective:
+            yield {"statement": statement, "verdict": "SKIPPED_SUBJECTIVE"}
+        else:
+            verdict = next(verdicts)
+            if verdict is None:
+                # This row's check failed; the rest of the batch is unaffected
+                yield {"statement": statement, "verdict": "ERROR"}
+            else:
+                yield {"statement": statement, "verdict": "YES" if verdict else "NO"}
 
-        # Skip calling check_statement; hard-code YES for non-subjective statements
-        results.append({"statement": statement, "verdict": "YES"})
 
-    return results
+def _verdicts_from_statements(statements: pd.Series) -> List[Dict[str, str]]:
+    """List-returning wrapper around _iter_statement_verdicts."""
+    return list(_iter_statement_verdicts(statements))
+
+
+def process_statements_from_csv(csv_file_path: str, statement_column: str = 'statement'):
+    """
+    Read statements from a CSV file and yield UI-friendly verdicts for each.
+
+    For each non-empty statement:
+      - If subjective, yield verdict "SKIPPED_SUBJECTIVE" without calling check_statement
+      - Otherwise, call check_statement and yield verdict "YES" or "NO"
+
+    Yields {"statement": str, "verdict": str} dicts; wrap in list() when the
+    whole result set is needed at once.
+    """
+    if not validate_csv_file(csv_file_path):
+        return
+
+    try:
+        df = pd.read_csv(csv_file_path, usecols=[statement_column], dtype="string")
+    except ValueError:
+        log.warning("Column '%s' not found in CSV.", statement_column)
+        return
+    except Exception as e:
+        log.error("Error reading CSV file: %s", e)
+        return
+
+    yield from _iter_statement_verdicts(df[statement_column])
 
 
 def process_statements_from_csv_content(
@@ -167,73 +239,82 @@ def process_statements_from_csv_content(
     Process CSV content (string or bytes) and return UI-friendly verdicts.
     Mirrors the logic of process_statements_from_csv.
     """
-    if isinstance(csv_content, bytes):
-        data_str = csv_content.decode('utf-8', errors='ignore')
-    else:
-        data_str = csv_content
-
-    reader = csv.DictReader(io.StringIO(data_str))
-    if statement_column not in (reader.fieldnames or []):
+    statements = _statements_from_bytes(csv_content, statement_column)
+    if statements is None:
         return []
+    return _verdicts_from_statements(statements)
 
-    results: List[Dict[str, str]] = []
-    for row in reader:
-        statement = extract_statement_from_row(row, statement_column)
-        if not statement:
-            continue
-        if detect_subjectivity(statement):
-            results.append({"statement": statement, "verdict": "SKIPPED_SUBJECTIVE"})
-            continue
-        # verdict = "YES" if check_statement(statement) else "NO"
-        # results.append({"statement": statement, "verdict": verdict})
 
-        # Skip calling check_statement; hard-code YES for non-subjective statements
-        results.append({"statement": statement, "verdict": "YES"})
+def _statements_from_bytes(
+    csv_content: Union[str, bytes],
+    statement_column: str = 'statement'
+) -> Optional[pd.Series]:
+    """
+    Parse raw CSV content into the statement column, or None on failure.
 
-    return results
+    Uses pyarrow's multi-threaded, SIMD-backed CSV reader directly on the
+    bytes: no full str copy of the upload, and the column comes out in
+    columnar layout ready for the vectorized filters.
+    """
+    raw_bytes = csv_content if isinstance(csv_content, bytes) else csv_content.encode('utf-8')
+
+    try:
+        table = pa_csv.read_csv(io.BytesIO(raw_bytes))
+    except Exception as e:
+        log.error("Error parsing CSV content: %s", e)
+        return None
+
+    if statement_column not in table.column_names:
+        return None
+
+    return table.column(statement_column).to_pandas().astype("string")
 
 
 # =============================================================================
 # OUTPUT FUNCTIONS
 # =============================================================================
 
-def save_results_to_csv(results: List[Dict], output_file: str = 'processed_statements.csv') -> bool:
+def save_results_to_csv(results, output_file: str = 'processed_statements.csv') -> bool:
     """
-    Save the processed results to a CSV file.
-    
+    Save processed results to a CSV file, writing rows as they arrive.
+
+    Accepts any iterable of dicts (including the generator returned by
+    process_statements_from_csv), so large jobs never hold the whole output
+    and a second serialized copy in memory at once.
+
     Args:
-        results (List[Dict]): The processed statements
+        results: Iterable of processed statement dicts
         output_file (str): Output CSV file path
-        
+
     Returns:
-        bool: True if successful, False otherwise
+        bool: True if at least one row was written, False otherwise
     """
-    if not results:
-        print("No results to save.")
+    rows = iter(results)
+    try:
+        first_row = next(rows)
+    except StopIteration:
+        log.warning("No results to save.")
         return False
-    
-    # Determine output schema: new UI shape or legacy shape
-    if results and all('statement' in r and 'verdict' in r for r in results):
-        fieldnames = ['statement', 'verdict']
-        additional_fields = set(results[0].keys()) - set(fieldnames)
-        if additional_fields:
-            fieldnames.extend(sorted(additional_fields))
-    else:
-        fieldnames = ['row_number', 'original_statement', 'is_factual']
-        if results:
-            additional_fields = set(results[0].keys()) - set(fieldnames)
-            fieldnames.extend(sorted(additional_fields))
-    
+
+    # Header comes straight from the first row's insertion order (dicts
+    # preserve it), covering both the UI shape and the legacy shape without
+    # building and sorting key sets
+    fieldnames = list(first_row.keys())
+
     try:
         with open(output_file, 'w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(results)
-        
-        print(f"Results saved to '{output_file}'")
+            # Plain csv.writer with list rows skips DictWriter's per-row
+            # key validation and dict round-trip
+            writer = csv.writer(file)
+            writer.writerow(fieldnames)
+            writer.writerow([first_row[k] for k in fieldnames])
+            for row in rows:
+                writer.writerow([row.get(k, '') for k in fieldnames])
+
+        log.info("Results saved to '%s'", output_file)
         return True
     except Exception as e:
-        print(f"Error saving results: {e}")
+        log.error("Error saving results: %s", e)
         return False
 
 
@@ -243,22 +324,36 @@ def save_results_to_csv(results: List[Dict], output_file: str = 'processed_state
 
 class FactChecker:
     def __init__(self):
-        """Initialize the FactChecker with spaCy model for NLP processing."""
-        self.nlp = load_spacy_model()
-    
+        """Initialize the FactChecker with a per-statement analysis cache."""
+        self._analysis_cache: Dict[str, Dict] = {}
+
+    def _analyze(self, statement: str) -> Dict:
+        """Fetch (or reuse) the fused subject/predicate/questions analysis."""
+        if statement not in self._analysis_cache:
+            try:
+                self._analysis_cache[statement] = analyze_statement(statement)
+            except Exception as e:
+                # Offline fallback: cheap heuristic split without any LLM call
+                log.warning("LLM analysis failed (%s), using fallback extractor", e)
+                subject, predicate = extract_components_fallback(statement)
+                self._analysis_cache[statement] = {
+                    "subject": subject,
+                    "predicate": predicate,
+                    "questions": [],
+                }
+        return self._analysis_cache[statement]
+
     def read_statements_from_csv(self, csv_file_path: str, statement_column: str = 'statement') -> List[Dict]:
         """Legacy method that calls the new decoupled function."""
-        return process_statements_from_csv(csv_file_path, statement_column)
-    
+        return list(process_statements_from_csv(csv_file_path, statement_column))
+
     def extract_subject(self, statement: str) -> str:
-        """Legacy method that returns subject using merged extractor."""
-        subject, _ = extract_components(statement, self.nlp)
-        return subject
-    
+        """Legacy method that returns subject from the fused LLM analysis."""
+        return self._analyze(statement)["subject"]
+
     def extract_predicate(self, statement: str) -> str:
-        """Legacy method that returns predicate using merged extractor."""
-        _, predicate = extract_components(statement, self.nlp)
-        return predicate
+        """Legacy method that returns predicate from the fused LLM analysis."""
+        return self._analyze(statement)["predicate"]
     
     def detect_subjectivity(self, statement: str) -> bool:
         """Legacy method that calls the new decoupled function."""
@@ -274,7 +369,7 @@ class FactChecker:
 
 if __name__ == "__main__":
     # Process statements from CSV for a quick demo
-    results = process_statements_from_csv('sample_statements.csv')
+    results = list(process_statements_from_csv('sample_statements.csv'))
 
     if results:
         print(f"Processed {len(results)} statements:")
@@ -302,13 +397,79 @@ app.add_middleware(
 )
 
 
+async def _read_upload_validated(file: UploadFile) -> Optional[bytes]:
+    """
+    Read an upload, validating its CSV header from the first 8 KB only.
+
+    A rejected upload costs one small read instead of buffering the whole
+    file; on success the remaining bytes are read and appended to the peeked
+    prefix. (A header row longer than 8 KB would be truncated, but such
+    headers don't occur in practice.)
+
+    Returns:
+        Optional[bytes]: The full upload, or None if the header lacks a
+        'statement' column.
+    """
+    prefix = await file.read(8192)
+    header_line = prefix.split(b"\n", 1)[0].decode("utf-8", errors="ignore")
+    fieldnames = next(csv.reader(io.StringIO(header_line)), None)
+    if not fieldnames or 'statement' not in fieldnames:
+        return None
+    return prefix + await file.read()
+
+
 @app.post("/factcheck/upload")
 async def factcheck_upload(file: UploadFile = File(...)):
-    data = (await file.read()).decode("utf-8", errors="ignore")
-    # Validate CSV header quickly
-    reader = csv.DictReader(io.StringIO(data))
-    if not reader.fieldnames or 'statement' not in reader.fieldnames:
+    raw_bytes = await _read_upload_validated(file)
+    if raw_bytes is None:
         return {"error": "CSV must have a 'statement' column"}
 
-    results = process_statements_from_csv_content(data)
+    # The parse/check pipeline is blocking (network + CPU); run it in the
+    # threadpool so the event loop keeps serving other requests meanwhile
+    results = await run_in_threadpool(process_statements_from_csv_content, raw_bytes)
     return {"results": results}
+
+
+async def _stream_verdict_lines(cleaned: List[str], subjective: List[bool]):
+    """Yield one JSONL verdict line per statement, in completion order."""
+    # Subjective rows resolve locally; emit them immediately
+    for statement, is_subj in zip(cleaned, subjective):
+        if is_subj:
+            yield orjson.dumps(
+                {"statement": statement, "verdict": "SKIPPED_SUBJECTIVE"}
+            ) + b"\n"
+
+    factual = [s for s, is_subj in zip(cleaned, subjective) if not is_subj]
+    async for index, is_factual in astream_statements(factual):
+        if is_factual is None:
+            verdict = "ERROR"
+        else:
+            verdict = "YES" if is_factual else "NO"
+        yield orjson.dumps(
+            {"statement": factual[index], "verdict": verdict}
+        ) + b"\n"
+
+
+@app.post("/factcheck/upload/stream")
+async def factcheck_upload_stream(file: UploadFile = File(...)):
+    """
+    Streaming variant of /factcheck/upload: emits one JSON line per
+    statement as its verdict completes, so the client can render results
+    while the slower checks are still in flight instead of waiting for the
+    whole batch.
+    """
+    raw_bytes = await _read_upload_validated(file)
+    if raw_bytes is None:
+        return {"error": "CSV must have a 'statement' column"}
+
+    # CPU-bound parse + filters stay off the event loop; the checks
+    # themselves are async and stream as they complete
+    statements = await run_in_threadpool(_statements_from_bytes, raw_bytes)
+    if statements is None:
+        return {"error": "Could not parse CSV content"}
+    cleaned, subjective = await run_in_threadpool(_clean_and_flag, statements)
+
+    return StreamingResponse(
+        _stream_verdict_lines(cleaned, subjective),
+        media_type="application/x-ndjson",
+    )
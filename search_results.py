@@ -1,20 +1,72 @@
+import asyncio
+import logging
 import os
+import time
 from pathlib import Path
 from tavily import TavilyClient
 from dotenv import load_dotenv
 from typing import Optional, List
+import diskcache
+import httpx
 import requests
 import json
-from openai import OpenAI
-from transformers import AutoModelForCausalLM, AutoTokenizer
+import xxhash
+from functools import lru_cache
+from openai import OpenAI, AsyncOpenAI
+from transformers import AutoModelForCausalLM, AutoTokenizer, LogitsProcessorList
 import torch
 
+try:
+    import tiktoken
+    _TIKTOKEN_AVAILABLE = True
+except ImportError:
+    _TIKTOKEN_AVAILABLE = False
+
+try:
+    from transformers import TorchAoConfig
+    _TORCHAO_AVAILABLE = True
+except ImportError:
+    _TORCHAO_AVAILABLE = False
+
+try:
+    from transformers import BitsAndBytesConfig
+    _BNB_AVAILABLE = True
+except ImportError:
+    _BNB_AVAILABLE = False
+
 load_dotenv('config.env')
 
+log = logging.getLogger(__name__)
+
 # Global variables for Mistral model loading
 _mistral_model = None
 _mistral_tokenizer = None
 
+# Persistent request-level cache shared with checker.py. Tavily results and
+# the temperature=0 yes/no classifications are deterministic per query, so
+# re-uploading a CSV with repeated statements answers from disk in
+# microseconds instead of re-paying network RTT and LLM cost. Entries expire
+# after a day so stale search results age out.
+_cache = diskcache.Cache(".factcheck_cache")
+_CACHE_EXPIRE_SECONDS = 86400
+
+# Pooled keep-alive session for the sync Tavily path: without it every call
+# pays a fresh TCP + TLS handshake (~100-300ms). Retries with backoff cover
+# transient 5xx/connection drops instead of surfacing them per row.
+_TAVILY_SESSION = requests.Session()
+_TAVILY_SESSION.mount("https://", requests.adapters.HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=requests.adapters.Retry(total=3, backoff_factor=0.3),
+))
+_TAVILY_SESSION.headers.update({"Accept-Encoding": "gzip"})
+
+
+def _query_cache_key(prefix: str, query: str) -> str:
+    """Hash a whitespace/case-normalized query under a per-function prefix."""
+    normalized = " ".join(query.lower().split())
+    return f"{prefix}:{xxhash.xxh64(normalized).hexdigest()}"
+
 def tavily_search(
     query: str = "",
     api_key: str = os.getenv('TAVILY_API_KEY'),
@@ -69,24 +121,38 @@ def tavily_search(
     # Remove None values to avoid sending empty fields
     payload = {k: v for k, v in payload.items() if v is not None}
 
+    # Key on the query plus the knobs that change the result set
+    cache_key = _query_cache_key(
+        f"tavily:{max_results}:{search_depth}:{topic}", query
+    )
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = _TAVILY_SESSION.post(url, headers=headers, json=payload)
         response.raise_for_status()
         data = response.json()
 
         # if print_output:
         #     print(json.dumps(data, indent=4))
 
+        _cache.set(cache_key, data, expire=_CACHE_EXPIRE_SECONDS)
         return data
 
     except requests.exceptions.RequestException as e:
-        print(f"Request failed: {e}")
+        log.warning("Request failed: %s", e)
         return None
 
 def yes_no_openai(question: str) -> str:
     """
     Returns "Yes" or "No" based on analysis using OpenAI.
     """
+    cache_key = _query_cache_key("yes_no_openai", question)
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     data=tavily_search(
         query=question,
         # max_results=3,
@@ -105,7 +171,7 @@ Question:
 
 Answer (Yes/No only):
 """
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    client = get_openai_client()
 
     response = client.chat.completions.create(
         #model="gpt-4o-mini",  # lightweight reasoning model
@@ -115,12 +181,308 @@ Answer (Yes/No only):
             {"role": "user", "content": prompt},
         ],
         temperature=0,  # make output deterministic
+        **_openai_yes_no_kwargs("gpt-3.5-turbo-instruct"),
     )
 
     answer = response.choices[0].message.content.strip()
 
     # Normalize the output (e.g., "yes", "YES" → "Yes")
-    return "Yes" if answer.lower().startswith("y") else "No"
+    result = "Yes" if answer.lower().startswith("y") else "No"
+    _cache.set(cache_key, result, expire=_CACHE_EXPIRE_SECONDS)
+    return result
+
+
+# Shared OpenAI clients: creating OpenAI() per call builds a fresh httpx
+# client and re-runs the TCP/TLS handshake, which dominates small yes/no
+# responses. The sync client is a process-wide singleton; the async client
+# is cached per event loop, because each asyncio.run call closes its loop
+# and keep-alive connections bound to a closed loop fail with "Event loop
+# is closed" on the next call.
+_openai_client = None
+_async_openai_clients = {}
+
+
+@lru_cache(maxsize=4)
+def _openai_yes_no_kwargs(model: str) -> dict:
+    """
+    Chat-completion kwargs that constrain the answer to one Yes/No token.
+
+    The classification only ever needs the first token, so max_tokens=1 cuts
+    the decode work to a single forward pass. When tiktoken is installed the
+    Yes/No token ids are also heavily logit-biased so the top-1 token is one
+    of the two admissible answers.
+    """
+    kwargs = {"max_tokens": 1}
+    if _TIKTOKEN_AVAILABLE:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        yes_id = encoding.encode("Yes")[0]
+        no_id = encoding.encode("No")[0]
+        kwargs["logit_bias"] = {str(yes_id): 100, str(no_id): 100}
+    return kwargs
+
+
+def get_openai_client() -> OpenAI:
+    """Return a shared OpenAI client, creating it on first use."""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=32),
+            ),
+        )
+    return _openai_client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """Return an AsyncOpenAI client shared within the running event loop."""
+    # Drop clients whose loop has been closed (one per past asyncio.run)
+    for stale_loop in [l for l in _async_openai_clients if l.is_closed()]:
+        del _async_openai_clients[stale_loop]
+
+    loop = asyncio.get_running_loop()
+    client = _async_openai_clients.get(loop)
+    if client is None:
+        client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=32),
+            ),
+        )
+        _async_openai_clients[loop] = client
+    return client
+
+
+# Optional local inference sidecar (e.g. `vllm serve` or text-generation-
+# inference exposing an OpenAI-compatible API). Pointing
+# FACTCHECK_LOCAL_API_BASE at it keeps the Mistral weights hot in the
+# sidecar across FastAPI restarts: a process restart then costs one TCP
+# connect instead of re-reading ~14 GB of weights from disk into the GPU.
+_LOCAL_API_BASE = os.getenv("FACTCHECK_LOCAL_API_BASE")
+_LOCAL_API_MODEL = os.getenv("FACTCHECK_LOCAL_MODEL", "mistralai/Mistral-7B-Instruct-v0.3")
+_local_api_client = None
+
+
+def get_local_api_client() -> OpenAI:
+    """Return a shared client for the local inference sidecar."""
+    global _local_api_client
+    if _local_api_client is None:
+        _local_api_client = OpenAI(
+            base_url=_LOCAL_API_BASE,
+            api_key=os.getenv("FACTCHECK_LOCAL_API_KEY", "not-needed"),
+            http_client=httpx.Client(
+                limits=httpx.Limits(max_keepalive_connections=32),
+            ),
+        )
+    return _local_api_client
+
+
+async def atavily_search(
+    http_client: "httpx.AsyncClient",
+    query: str,
+    api_key: str = None,
+) -> Optional[dict]:
+    """Async Tavily search used by the batched yes/no path."""
+    if api_key is None:
+        api_key = os.getenv('TAVILY_API_KEY')
+
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}"
+    }
+    payload = {
+        "query": query,
+        "max_results": 5,
+        "topic": "general",
+        "search_depth": "basic",
+        "include_answer": True,
+    }
+
+    # Same key scheme as tavily_search, so sync and async paths share entries
+    cache_key = _query_cache_key("tavily:5:basic:general", query)
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        response = await http_client.post("https://api.tavily.com/search",
+                                          headers=headers, json=payload)
+        response.raise_for_status()
+        data = response.json()
+        _cache.set(cache_key, data, expire=_CACHE_EXPIRE_SECONDS)
+        return data
+    except httpx.HTTPError as e:
+        log.warning("Request failed: %s", e)
+        return None
+
+
+async def ayes_no_openai(http_client: "httpx.AsyncClient", question: str) -> str:
+    """Async variant of yes_no_openai: one Tavily search, one classification."""
+    cache_key = _query_cache_key("yes_no_openai", question)
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    data = await atavily_search(http_client, question)
+
+    prompt = f"""
+You are a precise analyst.
+Analyze the data below and answer the question strictly with "Yes" or "No".
+
+Data:
+{data}
+
+Question:
+{question}
+
+Answer (Yes/No only):
+"""
+    client = get_async_openai_client()
+    response = await client.chat.completions.create(
+        model="gpt-3.5-turbo-instruct",
+        messages=[
+            {"role": "system", "content": "You are a data analyst that only answers Yes or No."},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0,
+        **_openai_yes_no_kwargs("gpt-3.5-turbo-instruct"),
+    )
+
+    answer = response.choices[0].message.content.strip()
+    result = "Yes" if answer.lower().startswith("y") else "No"
+    _cache.set(cache_key, result, expire=_CACHE_EXPIRE_SECONDS)
+    return result
+
+
+def yes_no_openai_batch(
+    questions: List[str],
+    poll_interval: float = 10.0,
+    timeout: float = 3600.0,
+) -> List[str]:
+    """
+    Answer a batch of yes/no questions through the OpenAI Batch API.
+
+    One JSONL submission covers every question from an upload — roughly half
+    the per-token price and no per-call round-trips, at the cost of minutes of
+    queueing latency. Suited to bulk CSV jobs, not interactive requests.
+
+    Args:
+        questions (List[str]): The questions to evaluate.
+        poll_interval (float): Seconds between batch status polls.
+        timeout (float): Give up after this many seconds.
+
+    Returns:
+        List[str]: "Yes"/"No" per question, in input order.
+    """
+    if not questions:
+        return []
+
+    client = get_openai_client()
+
+    # Deduplicate so repeated questions cost one batch line; answers fan
+    # back out by position below
+    unique_questions = list(dict.fromkeys(questions))
+
+    # One JSONL request line per unique question, keyed by position
+    lines = []
+    for i, question in enumerate(unique_questions):
+        data = tavily_search(query=question)
+        prompt = f"""
+You are a precise analyst.
+Analyze the data below and answer the question strictly with "Yes" or "No".
+
+Data:
+{data}
+
+Question:
+{question}
+
+Answer (Yes/No only):
+"""
+        lines.append(json.dumps({
+            "custom_id": str(i),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": "gpt-3.5-turbo-instruct",
+                "messages": [
+                    {"role": "system", "content": "You are a data analyst that only answers Yes or No."},
+                    {"role": "user", "content": prompt},
+                ],
+                "temperature": 0,
+                **_openai_yes_no_kwargs("gpt-3.5-turbo-instruct"),
+            },
+        }))
+
+    batch_file = client.files.create(
+        file=("yes_no_batch.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+
+    deadline = time.monotonic() + timeout
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Batch {batch.id} did not finish within {timeout}s")
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} finished with status {batch.status}")
+
+    output = client.files.content(batch.output_file_id).text
+    unique_answers = ["No"] * len(unique_questions)
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        content = record["response"]["body"]["choices"][0]["message"]["content"].strip()
+        unique_answers[int(record["custom_id"])] = "Yes" if content.lower().startswith("y") else "No"
+    answer_for = dict(zip(unique_questions, unique_answers))
+    return [answer_for[q] for q in questions]
+
+
+async def yes_no_batch_async(questions: List[str], use_local: bool = False) -> List[str]:
+    """
+    Answer a batch of yes/no questions with all network calls in flight at once.
+
+    Args:
+        questions (List[str]): The questions to evaluate.
+        use_local (bool): If True, use local Mistral model. If False, use OpenAI.
+
+    Returns:
+        List[str]: "Yes"/"No" per question, in input order.
+    """
+    if not questions:
+        return []
+
+    if use_local:
+        # Local generation is GPU-bound; one padded generate call covers the
+        # whole batch instead of N sequential ones.
+        return yes_no_mistral_batch(questions)
+
+    # Deduplicate first: repeated questions (common when statements share an
+    # entity) cost one search + one classification instead of one per row
+    unique_questions = list(dict.fromkeys(questions))
+    async with httpx.AsyncClient(timeout=30.0) as http_client:
+        tasks = [ayes_no_openai(http_client, q) for q in unique_questions]
+        unique_answers = await asyncio.gather(*tasks)
+    answer_for = dict(zip(unique_questions, unique_answers))
+    return [answer_for[q] for q in questions]
+
+
+def yes_no_batch(questions: List[str], use_local: bool = False) -> List[str]:
+    """Synchronous wrapper around yes_no_batch_async."""
+    return asyncio.run(yes_no_batch_async(questions, use_local=use_local))
 
 
 def yes_no(question: str, use_local: bool = False) -> str:
@@ -141,6 +503,57 @@ def yes_no(question: str, use_local: bool = False) -> str:
         return yes_no_openai(question)
 
 
+# The compiled forward re-captures for every new sequence length it sees,
+# and each prompt embeds a different Tavily result blob, so unbucketed
+# inputs would recompile on virtually every call. Left-padding prompts up to
+# the next multiple of this bucket keeps the set of distinct shapes (and
+# hence recompiles) small.
+_COMPILE_BUCKET = 128
+
+
+def _pad_to_bucket(input_ids, pad_token_id):
+    """
+    Left-pad input ids up to the next _COMPILE_BUCKET multiple.
+
+    Returns the padded ids and a matching attention mask (zeros over the
+    padding) so generate ignores the filler tokens.
+    """
+    seq_len = input_ids.shape[1]
+    bucket_len = -(-seq_len // _COMPILE_BUCKET) * _COMPILE_BUCKET
+    attention_mask = torch.ones_like(input_ids)
+    if bucket_len == seq_len:
+        return input_ids, attention_mask
+    padding = torch.full(
+        (input_ids.shape[0], bucket_len - seq_len),
+        pad_token_id,
+        dtype=input_ids.dtype,
+    )
+    input_ids = torch.cat([padding, input_ids], dim=1)
+    attention_mask = torch.cat([torch.zeros_like(padding), attention_mask], dim=1)
+    return input_ids, attention_mask
+
+
+class _YesNoOnlyLogitsProcessor:
+    """Mask every logit except the Yes/No token ids (constrained decoding)."""
+
+    def __init__(self, allowed_token_ids):
+        self.allowed_token_ids = list(allowed_token_ids)
+
+    def __call__(self, input_ids, scores):
+        masked = torch.full_like(scores, float("-inf"))
+        masked[:, self.allowed_token_ids] = scores[:, self.allowed_token_ids]
+        return masked
+
+
+@lru_cache(maxsize=1)
+def _mistral_yes_no_token_ids():
+    """First-token ids for "Yes" and "No" under the cached Mistral tokenizer."""
+    _, tokenizer = load_mistral_model()
+    yes_id = tokenizer.encode("Yes", add_special_tokens=False)[0]
+    no_id = tokenizer.encode("No", add_special_tokens=False)[0]
+    return yes_id, no_id
+
+
 def load_mistral_model():
     """
     Load the local Mistral model and tokenizer.
@@ -154,22 +567,18 @@ def load_mistral_model():
     # Get absolute path to the model directory
     model_path = Path("models/Mistral-7B-Instruct-v0.3").resolve()
     
-    print(f"Loading Mistral model from {model_path}...")
+    log.info("Loading Mistral model from %s...", model_path)
     
     # Check if model directory exists
     if not model_path.exists():
-        print(f"Error: Model directory not found at {model_path}")
-        print("Please run: python download_model.py")
-        print("Falling back to OpenAI...")
+        log.error("Model directory not found at %s; run: python download_model.py. Falling back to OpenAI...", model_path)
         return None, None
     
     # Check for essential model files
     required_files = ["config.json", "tokenizer.json"]
     missing_files = [f for f in required_files if not (model_path / f).exists()]
     if missing_files:
-        print(f"Error: Missing required files: {missing_files}")
-        print("Model download appears incomplete. Please run: python download_model.py")
-        print("Falling back to OpenAI...")
+        log.error("Missing required files: %s. Model download appears incomplete; run: python download_model.py. Falling back to OpenAI...", missing_files)
         return None, None
     
     try:
@@ -179,39 +588,82 @@ def load_mistral_model():
         if _mistral_tokenizer.pad_token is None:
             _mistral_tokenizer.pad_token = _mistral_tokenizer.eos_token
         
+        # Pin the whole model to one device: device_map="auto" can spill
+        # layers to CPU on single-GPU hosts, forcing host-device transfers on
+        # every forward pass (which torch.compile cannot optimize away).
+        # Safetensors weights load via mmap with low_cpu_mem_usage.
+        load_kwargs = {
+            "torch_dtype": torch.bfloat16,
+            "device_map": {"": "cuda:0"} if torch.cuda.is_available() else "cpu",
+            "trust_remote_code": True,
+            "low_cpu_mem_usage": True,
+        }
+
+        # 4-bit quantization: decode reads every weight per token, so cutting
+        # weight bytes 4x directly cuts the memory bandwidth each step needs.
+        # FACTCHECK_HF_QUANT picks the scheme: "int4" (torchao weight-only,
+        # the default, composes with torch.compile below), "nf4"
+        # (bitsandbytes NormalFloat4, better accuracy retention at the same
+        # footprint), or "none" for plain bf16.
+        quant_choice = os.getenv("FACTCHECK_HF_QUANT", "int4").lower()
+        if quant_choice == "nf4" and _BNB_AVAILABLE:
+            load_kwargs["quantization_config"] = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_compute_dtype=torch.bfloat16,
+                bnb_4bit_quant_type="nf4",
+            )
+        elif quant_choice == "int4" and _TORCHAO_AVAILABLE:
+            load_kwargs["quantization_config"] = TorchAoConfig(
+                quant_type="int4_weight_only", group_size=128
+            )
+        elif quant_choice != "none":
+            log.warning("Quantization backend for %r not available, loading Mistral in bf16", quant_choice)
+
         _mistral_model = AutoModelForCausalLM.from_pretrained(
             str(model_path),
-            torch_dtype=torch.bfloat16,
-            device_map="auto",
-            trust_remote_code=True,
-            low_cpu_mem_usage=True
+            **load_kwargs
+        )
+
+        # Static KV cache + compiled forward: decode at small batch sizes is
+        # dominated by Python/dispatch overhead, so compiling the forward pass
+        # with a fixed-size cache gives roughly a 30% speedup after warm-up.
+        _mistral_model.generation_config.cache_implementation = "static"
+        _mistral_model.generation_config.max_length = 1024
+        _mistral_model.forward = torch.compile(
+            _mistral_model.forward, mode="reduce-overhead", fullgraph=False
         )
-        print("Mistral model loaded successfully!")
+
+        # Warm-up generate at a bucketed shape to pay the one-time
+        # compilation cost at load time instead of on the first real
+        # question (which will present the same padded length).
+        try:
+            warmup_ids = _mistral_tokenizer("Warm up.", return_tensors="pt").input_ids
+            warmup_ids, warmup_mask = _pad_to_bucket(
+                warmup_ids, _mistral_tokenizer.pad_token_id
+            )
+            if hasattr(_mistral_model, 'device'):
+                warmup_ids = warmup_ids.to(_mistral_model.device)
+                warmup_mask = warmup_mask.to(_mistral_model.device)
+            with torch.no_grad():
+                _mistral_model.generate(
+                    input_ids=warmup_ids,
+                    attention_mask=warmup_mask,
+                    max_new_tokens=4,
+                )
+        except Exception as e:
+            log.warning("Warm-up generation failed: %s", e)
+
+        log.info("Mistral model loaded successfully!")
         return _mistral_model, _mistral_tokenizer
     except Exception as e:
-        print(f"Error loading Mistral model: {e}")
-        print("Falling back to OpenAI...")
+        log.error("Error loading Mistral model: %s. Falling back to OpenAI...", e)
         return None, None
 
 
-def yes_no_mistral(question: str) -> str:
-    """
-    Returns "Yes" or "No" based on analysis using local Mistral model.
-    
-    Args:
-        question (str): The question to evaluate.
-        
-    Returns:
-        str: "Yes" or "No"
-    """
-    model, tokenizer = load_mistral_model()
-    
-    if model is None or tokenizer is None:
-        print("Mistral model not available, falling back to OpenAI")
-        return yes_no_openai(question)
-    
+def _yes_no_messages(question: str) -> list:
+    """Build the search-grounded chat messages for one yes/no question."""
     data = tavily_search(query=question)
-    
+
     prompt = f"""
 You are a precise analyst.
 Analyze the data below and answer the question strictly with "Yes" or "No".
@@ -224,38 +676,86 @@ Question:
 
 Answer (Yes/No only):
 """
-    
-    # Format messages for Mistral
-    messages = [
+    return [
         {"role": "system", "content": "You are a data analyst that only answers Yes or No."},
         {"role": "user", "content": prompt}
     ]
-    
-    # Apply chat template
+
+
+def yes_no_mistral(question: str) -> str:
+    """
+    Returns "Yes" or "No" based on analysis using local Mistral model.
+
+    Args:
+        question (str): The question to evaluate.
+
+    Returns:
+        str: "Yes" or "No"
+    """
+    cache_key = _query_cache_key("yes_no_mistral", question)
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    model, tokenizer = None, None
+    if _LOCAL_API_BASE is None:
+        model, tokenizer = load_mistral_model()
+
+        if model is None or tokenizer is None:
+            log.warning("Mistral model not available, falling back to OpenAI")
+            return yes_no_openai(question)
+
+    messages = _yes_no_messages(question)
+
+    # Sidecar path: the weights never leave the sidecar process, so this is
+    # one local HTTP round-trip regardless of how often this process restarts
+    if _LOCAL_API_BASE is not None:
+        client = get_local_api_client()
+        response = client.chat.completions.create(
+            model=_LOCAL_API_MODEL,
+            messages=messages,
+            temperature=0,
+        )
+        answer = response.choices[0].message.content.strip()
+        result = "Yes" if answer.lower().startswith("y") else "No"
+        _cache.set(cache_key, result, expire=_CACHE_EXPIRE_SECONDS)
+        return result
+
+    # Tokenize directly through the chat template: one tokenization pass and
+    # one host-to-device copy, instead of template -> string -> re-tokenize
     try:
-        formatted_prompt = tokenizer.apply_chat_template(
+        input_ids = tokenizer.apply_chat_template(
             messages,
-            tokenize=False,
-            add_generation_prompt=True
+            add_generation_prompt=True,
+            return_tensors="pt"
         )
     except Exception as e:
-        print(f"Warning: apply_chat_template failed: {e}")
+        log.warning("apply_chat_template failed: %s", e)
         # Fallback: create prompt manually
-        formatted_prompt = f"You are a data analyst that only answers Yes or No.\n\n{prompt}"
-    
-    # Tokenize
-    inputs = tokenizer(formatted_prompt, return_tensors="pt")
-    # Move to device if available
+        formatted_prompt = f"{messages[0]['content']}\n\n{messages[1]['content']}"
+        input_ids = tokenizer(formatted_prompt, return_tensors="pt").input_ids
+
+    # Bucket the prompt length so the compiled forward reuses a cached shape
+    pad_token_id = (tokenizer.pad_token_id
+                    if tokenizer.pad_token_id is not None else tokenizer.eos_token_id)
+    input_ids, attention_mask = _pad_to_bucket(input_ids, pad_token_id)
     if hasattr(model, 'device'):
-        inputs = {k: v.to(model.device) if hasattr(v, 'to') else v for k, v in inputs.items()}
-    
-    # Set up generation parameters
+        input_ids = input_ids.to(model.device)
+        attention_mask = attention_mask.to(model.device)
+    inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+
+    # Constrained decoding: the answer is semantically one token, so a single
+    # forward pass with every logit except Yes/No masked out replaces up to
+    # 50 decode steps — local inference becomes prefill-dominated.
+    yes_id, no_id = _mistral_yes_no_token_ids()
     generation_kwargs = {
-        "max_new_tokens": 50,
-        "temperature": 0.0,
+        "max_new_tokens": 1,
         "do_sample": False,
+        "logits_processor": LogitsProcessorList(
+            [_YesNoOnlyLogitsProcessor([yes_id, no_id])]
+        ),
     }
-    
+
     # Handle pad token
     if tokenizer.pad_token_id is None:
         generation_kwargs["pad_token_id"] = tokenizer.eos_token_id
@@ -267,17 +767,118 @@ Answer (Yes/No only):
         try:
             outputs = model.generate(**inputs, **generation_kwargs)
         except Exception as e:
-            print(f"Error during generation: {e}")
+            log.error("Error during generation: %s", e)
             raise
     
-    # Decode
-    generated_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
-    
-    # Extract the generated part (after the input prompt)
-    answer = generated_text[len(formatted_prompt):].strip()
-    
-    # Normalize the output (e.g., "yes", "YES" → "Yes")
-    return "Yes" if answer.lower().startswith("y") else "No"
+    # The single generated token is one of the two admissible ids, so no
+    # decode/string-normalization pass is needed
+    result = "Yes" if outputs[0, -1].item() == yes_id else "No"
+    _cache.set(cache_key, result, expire=_CACHE_EXPIRE_SECONDS)
+    return result
+
+
+def yes_no_mistral_batch(questions: List[str]) -> List[str]:
+    """
+    Answer many yes/no questions with one padded model.generate call.
+
+    Left-padding puts every row's answer in the final token position, so the
+    whole batch shares a single forward pass (one CUDA launch, one KV cache
+    allocation) instead of N sequential generate calls. Cache hits resolve
+    first; only misses join the batch.
+
+    Args:
+        questions (List[str]): The questions to evaluate.
+
+    Returns:
+        List[str]: "Yes"/"No" per question, in input order.
+    """
+    if not questions:
+        return []
+
+    keys = [_query_cache_key("yes_no_mistral", q) for q in questions]
+    answers = [_cache.get(key) for key in keys]
+    miss_indices = [i for i, a in enumerate(answers) if a is None]
+    if not miss_indices:
+        return answers
+
+    # The sidecar batches continuously on its own, so per-question calls are
+    # already coalesced server-side
+    if _LOCAL_API_BASE is not None:
+        for i in miss_indices:
+            answers[i] = yes_no_mistral(questions[i])
+        return answers
+
+    model, tokenizer = load_mistral_model()
+    if model is None or tokenizer is None:
+        log.warning("Mistral model not available, falling back to OpenAI")
+        for i in miss_indices:
+            answers[i] = yes_no_openai(questions[i])
+        return answers
+
+    # Deduplicate misses by normalized key: repeated questions share one
+    # Tavily call and one row of the padded batch
+    first_index_for_key = {}
+    for i in miss_indices:
+        first_index_for_key.setdefault(keys[i], i)
+    unique_indices = list(first_index_for_key.values())
+
+    prompts = []
+    for i in unique_indices:
+        messages = _yes_no_messages(questions[i])
+        try:
+            prompts.append(tokenizer.apply_chat_template(
+                messages, add_generation_prompt=True, tokenize=False
+            ))
+        except Exception as e:
+            log.warning("apply_chat_template failed: %s", e)
+            prompts.append(f"{messages[0]['content']}\n\n{messages[1]['content']}")
+
+    # Left-pad so the generated answer lands in the last column for all
+    # rows, rounding the padded length up to the compile bucket so the
+    # compiled forward reuses a cached shape
+    previous_side = tokenizer.padding_side
+    tokenizer.padding_side = "left"
+    try:
+        inputs = tokenizer(
+            prompts,
+            return_tensors="pt",
+            padding=True,
+            pad_to_multiple_of=_COMPILE_BUCKET,
+            truncation=True,
+            add_special_tokens=False,  # the chat template already adds BOS
+        )
+    finally:
+        tokenizer.padding_side = previous_side
+
+    if hasattr(model, 'device'):
+        inputs = {k: v.to(model.device) for k, v in inputs.items()}
+
+    yes_id, no_id = _mistral_yes_no_token_ids()
+    generation_kwargs = {
+        "max_new_tokens": 1,
+        "do_sample": False,
+        "logits_processor": LogitsProcessorList(
+            [_YesNoOnlyLogitsProcessor([yes_id, no_id])]
+        ),
+        "pad_token_id": tokenizer.pad_token_id
+        if tokenizer.pad_token_id is not None else tokenizer.eos_token_id,
+    }
+
+    with torch.no_grad():
+        try:
+            outputs = model.generate(**inputs, **generation_kwargs)
+        except Exception as e:
+            log.error("Error during batched generation: %s", e)
+            raise
+
+    result_for_key = {}
+    for row, i in zip(outputs, unique_indices):
+        result = "Yes" if row[-1].item() == yes_id else "No"
+        _cache.set(keys[i], result, expire=_CACHE_EXPIRE_SECONDS)
+        result_for_key[keys[i]] = result
+    for i in miss_indices:
+        answers[i] = result_for_key[keys[i]]
+    return answers
 
 
 # 🔍 Test the function directly when running this script
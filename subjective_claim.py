@@ -5,7 +5,31 @@ Transforms statements by removing subjective language and opinions.
 """
 
 import re
-from typing import List
+from functools import lru_cache
+from typing import List, Optional
+
+try:
+    import re2
+    _RE2_AVAILABLE = True
+except ImportError:
+    _RE2_AVAILABLE = False
+
+try:
+    from textblob import TextBlob
+    _TEXTBLOB_AVAILABLE = True
+except ImportError:
+    _TEXTBLOB_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    _PYARROW_AVAILABLE = True
+except ImportError:
+    _PYARROW_AVAILABLE = False
+
+# Statements scoring above this TextBlob subjectivity are dropped before any
+# LLM/search work
+SUBJECTIVITY_SCORE_THRESHOLD = 0.6
 
 
 def get_subjective_patterns() -> List[str]:
@@ -26,38 +50,102 @@ def get_subjective_patterns() -> List[str]:
 
 def get_opinion_words() -> List[str]:
     """Get list of opinion words to remove as fallback."""
-    return ['think', 'believe', 'feel', 'guess', 'suppose', 'assume', 
+    return ['think', 'believe', 'feel', 'guess', 'suppose', 'assume',
             'opinion', 'view', 'personally', 'probably', 'maybe', 'perhaps']
 
+
+# Frozenset lookup is O(1) and avoids rebuilding the word list per call
+_OPINION_WORDS = frozenset(get_opinion_words())
+
+# Combine the subjective patterns AND the opinion words into one alternation
+# at import time, so detection is a single scan of the statement instead of
+# one re.search call per pattern plus a word-by-word fallback loop.
+_SUBJ_PATTERN = "|".join(
+    [f"(?:{p})" for p in get_subjective_patterns()]
+    + [r"\b(?:" + "|".join(get_opinion_words()) + r")\b"]
+)
+
+# Compiled with stdlib re; pandas Series.str.contains needs this object.
+# IGNORECASE stays here because lowercasing a whole column first would cost
+# an extra full copy.
+_SUBJ_RE = re.compile(_SUBJ_PATTERN, re.IGNORECASE)
+
+# Prefer google-re2's DFA engine for the scalar scan when installed: the
+# pattern is a fixed union of literal-anchored alternations, which RE2 scans
+# in linear time with no backtracking. Compiled case-sensitively — the
+# patterns are all lowercase and detect_subjectivity lowercases its input
+# once, which keeps the automaton smaller than engine-side case folding.
+if _RE2_AVAILABLE:
+    try:
+        _SUBJ_SCANNER = re2.compile(_SUBJ_PATTERN)
+    except re2.error:
+        _SUBJ_SCANNER = re.compile(_SUBJ_PATTERN)
+else:
+    _SUBJ_SCANNER = re.compile(_SUBJ_PATTERN)
+
+
+@lru_cache(maxsize=4096)
+def subjectivity_score(statement: str) -> Optional[float]:
+    """
+    Local TextBlob subjectivity score in [0, 1], or None when TextBlob is
+    not installed. Cached so repeated statements are scored once.
+    """
+    if not _TEXTBLOB_AVAILABLE or not statement:
+        return None
+    return TextBlob(statement).sentiment.subjectivity
+
+
+def exceeds_subjectivity_threshold(statement: str) -> bool:
+    """
+    Near-free polarity screen for rows the pattern regex lets through.
+
+    Returns True when the local subjectivity score is confidently high, so
+    the caller can skip the LLM + web check entirely. False when TextBlob is
+    unavailable, keeping the regex filter as the only gate.
+    """
+    score = subjectivity_score(statement)
+    return score is not None and score > SUBJECTIVITY_SCORE_THRESHOLD
+
+
+def detect_subjectivity_series(statements):
+    """
+    Vectorized subjectivity detection over a pandas Series of statements.
+
+    Prefers pyarrow's match_substring_regex (RE2-backed, runs over the whole
+    column in C++); falls back to Series.str.contains with the compiled
+    stdlib regex when pyarrow is not installed. Either way it is one
+    vectorized pass instead of calling detect_subjectivity once per row.
+
+    Args:
+        statements: pandas Series of statement strings
+
+    Returns:
+        pandas Series of bool, True where subjective language is detected
+    """
+    if _PYARROW_AVAILABLE:
+        import pandas as pd
+        arr = pa.array(statements.fillna("").tolist(), type=pa.string())
+        mask = pc.match_substring_regex(arr, _SUBJ_PATTERN, ignore_case=True)
+        return pd.Series(mask.to_pylist(), index=statements.index, dtype=bool)
+    return statements.str.contains(_SUBJ_RE, regex=True, na=False)
+
+
 def detect_subjectivity(statement: str) -> bool:
     """
     Detect if a statement contains subjective language or opinions.
-    
+
     Args:
         statement (str): The input statement to analyze
-        
+
     Returns:
         bool: True if subjective language is detected, False otherwise
     """
     if not statement:
         return False
-    
-    # Check for subjective patterns
-    patterns = get_subjective_patterns()
-    
-    for pattern in patterns:
-        if re.search(pattern, statement, flags=re.IGNORECASE):
-            return True
-    
-    # Check for opinion words as fallback
-    opinion_words = get_opinion_words()
-    words = statement.lower().split()
-    
-    for word in words:
-        if word in opinion_words:
-            return True
-    
-    return False
+
+    # Lowercase once, then one scan: the case-sensitive compiled union covers
+    # both the subjective patterns and the opinion-word fallback
+    return _SUBJ_SCANNER.search(statement.lower()) is not None
 
 
 if __name__ == "__main__":